@@ -3,7 +3,13 @@ import re
 import sys
 import argparse
 import logging
-from typing import List, Dict, Tuple, Optional
+import shlex
+import hashlib
+import json
+import importlib.metadata
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
+from packaging.requirements import Requirement, InvalidRequirement # type: ignore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,43 +18,110 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CACHE_DIR = Path.home() / ".cache" / "pipdepresolver"
+STATE_FILE = CACHE_DIR / "state.json"
+
+_PIP_CHECK_RE = re.compile(
+    r"^([\w\-]+) ([\w.!+]*\w) has requirement ([\w\-]+)([>=<~!].+?), but you have ([\w\-]+) ([\w.!+]*\w)\.?$"
+)
+
+def _split_pip_check_line(line: str) -> Optional[Tuple[str, str, str, str, str, str]]:
+    """Découpe une ligne de conflit de pip check sans regex, None si le format diffère"""
+    package, _, rest = line.partition(' ')
+    package_version, sep, rest = rest.partition(' has requirement ')
+    if not sep:
+        return None
+    dep_spec, sep, current_part = rest.partition(', but you have ')
+    if not sep:
+        return None
+    
+    idx = next((i for i, c in enumerate(dep_spec) if c in '><=~!'), -1)
+    current_dependency, _, current_version = current_part.partition(' ')
+    current_version = current_version.rstrip('.')
+    
+    fields = (package, package_version, dep_spec[:idx], dep_spec[idx:], current_dependency, current_version)
+    if idx <= 0 or not all(fields) or any(' ' in field for field in fields[:3] + fields[4:]):
+        return None
+    return fields
+
+def _installed_fingerprint() -> str:
+    installed = sorted(
+        (name.lower(), dist.version)
+        for dist in importlib.metadata.distributions()
+        if (name := dist.metadata['Name'])
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((tuple(sys.version_info), sys.prefix)).encode())
+    for name, dist_version in installed:
+        digest.update(f"{name}=={dist_version}\n".encode())
+    return digest.hexdigest()
+
+def _load_state() -> Dict:
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(fingerprint: str, last_result: bool) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump({'fingerprint': fingerprint, 'last_result': last_result}, f)
+    except OSError as e:
+        logger.debug(f"Impossible d'écrire le cache {STATE_FILE}: {e}")
+
 class PipDependencyResolver:
     def __init__(self, auto_fix: bool = False, verbose: bool = False):
         self.auto_fix = auto_fix
         self.verbose = verbose
+        self.last_check_ok = False
         if verbose:
             logger.setLevel(logging.DEBUG)
         
-    def run_pip_check(self) -> Tuple[bool, str]:
+    def run_pip_check(self) -> Iterator[str]:
+        """Itère sur la sortie de pip check au fil de l'eau; le statut est dans self.last_check_ok"""
+        self.last_check_ok = False
         try:
-            result = subprocess.run(
-                ["pip", "check"], 
-                capture_output=True, 
-                text=True
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "pip", "check"], 
+                stdout=subprocess.PIPE, 
+                stderr=subprocess.STDOUT, 
+                text=True, 
+                bufsize=1
             )
-            return (result.returncode == 0, result.stdout or result.stderr)
         except Exception as e:
             logger.error(f"Erreur lors de l'exécution de pip check: {e}")
-            return (False, f"Erreur: {e}")
+            yield f"Erreur: {e}"
+            return
+        
+        with proc:
+            yield from proc.stdout
+        self.last_check_ok = proc.returncode == 0
     
-    def parse_pip_check_output(self, output: str) -> List[Dict]:
+    def parse_pip_check_output(self, lines: Iterable[str]) -> List[Dict]:
         errors = []
         
-        
-        pattern = r"([a-zA-Z0-9_\-]+) ([0-9\.]+) has requirement ([a-zA-Z0-9_\-]+)([>=<~!].+), but you have ([a-zA-Z0-9_\-]+) ([0-9\.]+)"
-        
-        for line in output.split('\n'):
+        for line in lines:
+            line = line.rstrip('\r\n')
             if not line.strip():
                 continue
                 
-            match = re.search(pattern, line)
-            if match:
-                package = match.group(1)
-                package_version = match.group(2)
-                dependency = match.group(3)
-                requirement = match.group(4)
-                current_dependency = match.group(5)
-                current_version = match.group(6)
+            if ' has requirement ' not in line:
+                errors.append({
+                    'type': 'generic',
+                    'raw_message': line
+                })
+                continue
+            
+            fields = _split_pip_check_line(line)
+            if fields is None:
+                match = _PIP_CHECK_RE.match(line)
+                if match:
+                    fields = match.groups()
+            
+            if fields:
+                package, package_version, dependency, requirement, current_dependency, current_version = fields
                 
                 errors.append({
                     'type': 'dependency_conflict',
@@ -75,7 +148,7 @@ class PipDependencyResolver:
             dependency = error['dependency']
             requirement = error['requirement']
             
-            fix_cmd = f"pip install --upgrade {dependency}{requirement}"
+            fix_cmd = f"pip install --upgrade {shlex.quote(dependency + requirement)}"
             
             alternative_cmd = f"pip install --upgrade {package}"
             
@@ -83,11 +156,23 @@ class PipDependencyResolver:
         elif error['type'] == 'generic':
             return None
     
-    def fix_error(self, command: str) -> Tuple[bool, str]:
-        logger.info(f"Exécution de la commande de correction: {command}")
+    def fix_spec(self, error: Dict) -> Optional[str]:
+        if error['type'] != 'dependency_conflict':
+            return None
+        spec = f"{error['dependency']}{error['requirement']}"
+        try:
+            Requirement(spec)
+        except InvalidRequirement:
+            logger.warning(f"Spécification invalide ignorée: {spec}")
+            return None
+        return spec
+    
+    def fix_error(self, specs: List[str]) -> Tuple[bool, str]:
+        command = [sys.executable, "-m", "pip", "install", "--upgrade", *specs]
+        logger.info(f"Exécution de la commande de correction: {shlex.join(command)}")
         try:
             result = subprocess.run(
-                command.split(), 
+                command, 
                 capture_output=True, 
                 text=True
             )
@@ -97,24 +182,32 @@ class PipDependencyResolver:
             return (False, f"Erreur: {e}")
     
     def resolve_dependencies(self) -> bool:
+        fingerprint = _installed_fingerprint()
+        state = _load_state()
+        if state.get('fingerprint') == fingerprint and state.get('last_result'):
+            logger.info("Aucun changement depuis la dernière vérification réussie, pip check ignoré.")
+            return True
+        
         logger.info("Vérification des dépendances avec pip check...")
-        success, output = self.run_pip_check()
+        errors = self.parse_pip_check_output(self.run_pip_check())
+        success = self.last_check_ok
+        _save_state(fingerprint, success)
         
         if success:
             logger.info("Aucun problème de dépendance détecté!")
             return True
         
         logger.info("Problèmes de dépendances détectés, analyse en cours...")
-        errors = self.parse_pip_check_output(output)
         
         if not errors:
             logger.warning("Aucune erreur spécifique identifiée dans la sortie de pip check.")
-            logger.warning(f"Sortie brute: {output}")
+            logger.warning("pip check n'a produit aucune sortie.")
             return False
         
         logger.info(f"{len(errors)} problèmes de dépendances identifiés.")
         
         all_fixed = True
+        pending_specs = []
         for idx, error in enumerate(errors, 1):
             logger.info(f"\nProblème {idx}/{len(errors)}:")
             logger.info(f"Message: {error['raw_message']}")
@@ -128,25 +221,34 @@ class PipDependencyResolver:
             logger.info(f"Solution suggérée: {fix_cmd}")
             
             if self.auto_fix:
-                cmd_to_execute = fix_cmd.split('\n')[0]
-                logger.info("Tentative de correction automatique...")
-                fix_success, fix_output = self.fix_error(cmd_to_execute)
-                
-                if fix_success:
-                    logger.info("Correction appliquée avec succès.")
-                    if self.verbose:
-                        logger.debug(f"Sortie: {fix_output}")
+                spec = self.fix_spec(error)
+                if spec:
+                    pending_specs.append(spec)
                 else:
-                    logger.error("Échec de la correction automatique.")
-                    logger.error(f"Erreur: {fix_output}")
-                    logger.info("Vous pouvez essayer les commandes suggérées manuellement.")
                     all_fixed = False
             else:
                 logger.info("Exécutez la commande ci-dessus pour résoudre ce problème.")
                 all_fixed = False
         
+        if self.auto_fix and pending_specs:
+            logger.info(f"\nTentative de correction automatique ({len(pending_specs)} dépendances en une seule installation)...")
+            fix_success, fix_output = self.fix_error(list(dict.fromkeys(pending_specs)))
+            
+            if fix_success:
+                logger.info("Correction appliquée avec succès.")
+                if self.verbose:
+                    logger.debug(f"Sortie: {fix_output}")
+            else:
+                logger.error("Échec de la correction automatique.")
+                logger.error(f"Erreur: {fix_output}")
+                logger.info("Vous pouvez essayer les commandes suggérées manuellement.")
+                all_fixed = False
+        
         if all_fixed and self.auto_fix:
-            final_success, final_output = self.run_pip_check()
+            final_errors = self.parse_pip_check_output(self.run_pip_check())
+            final_success = self.last_check_ok
+            final_output = "\n".join(error['raw_message'] for error in final_errors)
+            _save_state(_installed_fingerprint(), final_success)
             if final_success:
                 logger.info("\nTous les problèmes de dépendances ont été résolus avec succès!")
                 return True
@@ -1,12 +1,26 @@
 import sys
 import os
+import argparse
+import site
+import types
 import importlib.metadata
 import importlib
+import importlib.util
 import subprocess
 import re
 import logging
-from packaging import version # type: ignore
-import pkg_resources # type: ignore
+import functools
+import hashlib
+import json
+import time
+import urllib.request
+from pathlib import Path
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from packaging.requirements import Requirement, InvalidRequirement # type: ignore
+from packaging.specifiers import SpecifierSet, InvalidSpecifier # type: ignore
+from packaging.version import Version, InvalidVersion # type: ignore
+from packaging.utils import canonicalize_name # type: ignore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,107 +29,233 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CACHE_DIR = Path.home() / ".cache" / "pipdepresolver"
+PIP_LATEST_CACHE = CACHE_DIR / "pip_latest.json"
+PIP_LATEST_TTL = 86400
+METADATA_CACHE_DIR = CACHE_DIR / "metadata"
+METADATA_CACHE_TTL = 86400
+PYPI_PIP_URL = "https://pypi.org/pypi/pip/json"
+PIP_DRY_RUN_ARGS = ("--dry-run", "--ignore-installed", "--disable-pip-version-check", "--no-input", "--progress-bar", "off")
 
-def check_pip_installed():
+_DRY_RUN_LINE_RE = re.compile(
+    r"(?:Requirement already satisfied: (?P<req_name>[\w\-]+)(?P<version_req>[<>=~!].+?) in|Would install (?P<would_install>.+))"
+)
+_METADATA_NAME_RE = re.compile(r"^Name: *(\S+)", re.MULTILINE)
+_METADATA_VERSION_RE = re.compile(r"^Version: *(\S+)", re.MULTILINE)
+_WOULD_INSTALL_TOKEN_RE = re.compile(r"^(?P<name>[A-Za-z0-9_][\w.\-]*)-(?P<ver>\d[\w.!+\-]*)$")
+_NAME_SPLIT_RE = re.compile(r"[<>=~!\[;@ ]")
+
+_DIST_CACHE = {'installed': None, 'dependents_index': None}
+
+
+def get_latest_pip_version(installed_version=None):
     try:
-        result = subprocess.run(
-            [sys.executable, "-m", "pip", "--version"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        version_match = re.search(r'pip (\d+\.\d+\.\d+)', result.stdout)
-        if version_match:
-            return True, version_match.group(1)
-        return True, "Version inconnue"
-    except (subprocess.SubprocessError, FileNotFoundError):
-        return False, None
-
-def check_pip_latest_version():
+        if PIP_LATEST_CACHE.stat().st_mtime > time.time() - PIP_LATEST_TTL:
+            with open(PIP_LATEST_CACHE, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get('installed') == installed_version:
+                return cached['latest']
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    with urllib.request.urlopen(PYPI_PIP_URL, timeout=3) as r:
+        latest = json.load(r)["info"]["version"]
+    
     try:
-        pip_version_info = subprocess.run(
-            [sys.executable, "-m", "pip", "install", "--upgrade", "pip", "--dry-run"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        already_satisfied = "Requirement already satisfied" in pip_version_info.stdout
-        would_install = "Would install" in pip_version_info.stdout
-        
-        return already_satisfied and not would_install
-    except subprocess.SubprocessError:
-        return False
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(PIP_LATEST_CACHE, "w", encoding="utf-8") as f:
+            json.dump({'installed': installed_version, 'latest': latest}, f)
+    except OSError as e:
+        logger.debug(f"Impossible d'écrire le cache {PIP_LATEST_CACHE}: {e}")
+    
+    return latest
+
+def get_pip_status():
+    try:
+        installed_version = importlib.metadata.version("pip")
+    except importlib.metadata.PackageNotFoundError:
+        return None, None, False
+    
+    try:
+        latest_version = get_latest_pip_version(installed_version)
+        up_to_date = Version(latest_version) <= Version(installed_version)
+    except (OSError, ValueError, KeyError):
+        return installed_version, None, False
+    
+    return installed_version, latest_version, up_to_date
 
 def update_pip():
     logger.info("🔄 Mise à jour de pip...")
     try:
         subprocess.check_call(
             [sys.executable, "-m", "pip", "install", "--upgrade", "pip"],
-            stdout=subprocess.PIPE
+            stdout=subprocess.DEVNULL
         )
-        return True
+        _invalidate_dist_cache()
+        return importlib.metadata.version("pip")
     except subprocess.SubprocessError as e:
         logger.error(f"❌ Échec de la mise à jour de pip: {e}")
-        return False
+        return None
 
-def is_virtualenv():
-    return os.getenv('VIRTUAL_ENV') is not None
+@functools.lru_cache(maxsize=None)
+def _parse_base_requirement(req_str):
+    try:
+        req = Requirement(req_str)
+    except InvalidRequirement:
+        return None
+    if req.marker and not req.marker.evaluate({'extra': ''}):
+        return None
+    return canonicalize_name(req.name), str(req)
 
-def is_conda_env():
-    return os.getenv('CONDA_DEFAULT_ENV') is not None
+def _invalidate_dist_cache():
+    for key in _DIST_CACHE:
+        _DIST_CACHE[key] = None
 
-def get_installed_packages():
-    return {pkg.metadata['Name'].lower(): pkg.metadata['Version'] for pkg in importlib.metadata.distributions()}
+def _scan_env():
+    if _DIST_CACHE['installed'] is not None:
+        return _DIST_CACHE['installed'], _DIST_CACHE['dependents_index']
+    
+    installed = {}
+    reverse_deps = {}
+    
+    for dist in importlib.metadata.distributions():
+        project_name = dist.metadata['Name']
+        installed[canonicalize_name(project_name)] = dist.metadata['Version']
+        for req_str in dist.requires or []:
+            parsed = _parse_base_requirement(req_str)
+            if parsed:
+                reverse_deps.setdefault(parsed[0], []).append((project_name, dist.version, parsed[1]))
+    
+    _DIST_CACHE.update(installed=installed, dependents_index=reverse_deps)
+    return installed, reverse_deps
 
-def get_dependent_packages(package_name):
-    dependent_packages = {}
+def _fast_installed():
+    site_dirs = site.getsitepackages()
+    if site.ENABLE_USER_SITE:
+        site_dirs.append(site.getusersitepackages())
     
-    for dist in pkg_resources.working_set:
-        for req in dist.requires():
-            if req.name.lower() == package_name.lower():
-                dependent_packages[dist.project_name] = {
-                    'version': dist.version,
-                    'requirement': str(req)
-                }
-    
-    return dependent_packages
+    installed = {}
+    for site_dir in dict.fromkeys(site_dirs):
+        try:
+            entries = os.scandir(site_dir)
+        except OSError:
+            continue
+        
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith('.dist-info'):
+                    continue
+                
+                name_match = version_match = None
+                try:
+                    with open(os.path.join(entry.path, 'METADATA'), encoding='utf-8', errors='replace') as f:
+                        header = f.read(1024)
+                    name_match = _METADATA_NAME_RE.search(header)
+                    version_match = _METADATA_VERSION_RE.search(header)
+                except OSError:
+                    pass
+                
+                if name_match and version_match:
+                    name, dist_version = name_match.group(1), version_match.group(1)
+                else:
+                    dist = importlib.metadata.Distribution.at(entry.path)
+                    name, dist_version = dist.metadata['Name'], dist.version
+                    if not name:
+                        continue
+                installed.setdefault(canonicalize_name(name), dist_version)
+    
+    if not installed:
+        return {canonicalize_name(dist.metadata['Name']): dist.version for dist in importlib.metadata.distributions()}
+    return installed
 
-def get_package_requirements(package_name):
-    try:
-        output = subprocess.check_output(
-            [sys.executable, "-m", "pip", "install", package_name, "--dry-run", "--ignore-installed"],
-            stderr=subprocess.STDOUT,
-            text=True
-        )
-        return output
-    except subprocess.CalledProcessError as e:
+def get_installed_packages():
+    return _scan_env()[0]
+
+def get_dependent_packages(package_name, reverse_deps=None):
+    if reverse_deps is None:
+        reverse_deps = _scan_env()[1]
+    return {
+        project_name: {'version': dist_version, 'requirement': req_str}
+        for project_name, dist_version, req_str in reverse_deps.get(canonicalize_name(package_name), [])
+    }
+
+def _tee_lines(lines, tail, echo):
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if echo:
+            logger.info(line)
+        tail.append(line)
+        yield line
+
+def _run_dry_run(packages, echo=True):
+    tail = deque(maxlen=20)
+    with subprocess.Popen(
+        [sys.executable, "-m", "pip", "install", *packages, *PIP_DRY_RUN_ARGS],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1
+    ) as proc:
+        required = parse_required_packages(_tee_lines(proc.stdout, tail, echo))
+    return proc.returncode == 0, required, "\n".join(tail)
+
+def get_package_requirements(package_name, echo=True):
+    success, required, output_tail = _run_dry_run([package_name], echo)
+    if not success:
         logger.error(f"Erreur lors de la récupération des dépendances pour {package_name}")
-        logger.error(f"Message d'erreur: {e.output}")
+        logger.error(f"Message d'erreur: {output_tail}")
         return None
+    return required
 
-def parse_required_packages(pip_dry_run_output):
+def get_package_requirements_batch(packages):
+    if len(packages) == 1:
+        required = get_package_requirements(packages[0])
+        if required is None:
+            return None, list(packages), False
+        return required, [], True
+    
+    success, required, output_tail = _run_dry_run(packages)
+    if success:
+        return required, [], True
+    
+    logger.warning(f"⚠️ Échec de la résolution groupée pour {', '.join(packages)}, résolution package par package...")
+    logger.debug(f"Message d'erreur: {output_tail}")
+    with ThreadPoolExecutor(max_workers=min(8, len(packages))) as executor:
+        results = list(executor.map(lambda pkg: get_package_requirements(pkg, echo=False), packages))
+    
+    failed = [pkg for pkg, result in zip(packages, results) if result is None]
+    if len(failed) == len(packages):
+        return None, failed, False
+    if not failed:
+        logger.error(f"❌ {', '.join(packages)} se résolvent séparément mais sont incompatibles entre eux.")
+        logger.error(f"Message d'erreur: {output_tail}")
+        return None, [], False
+    
+    resolved = [(pkg, result) for pkg, result in zip(packages, results) if result is not None]
+    if len(resolved) == 1:
+        return resolved[0][1], failed, False
+    required, more_failed, _ = get_package_requirements_batch([pkg for pkg, _ in resolved])
+    return required, failed + more_failed, False
+
+def parse_required_packages(lines):
     required = {}
     
-    req_pattern = r"Requirement already satisfied: ([a-zA-Z0-9_\-]+)([<>=~!].+?) in"
-    
-    would_install_pattern = r"Would install (.+)"
-    
-    for line in pip_dry_run_output.splitlines():
-        req_match = re.search(req_pattern, line)
-        if req_match:
-            name = req_match.group(1).lower()
-            version_req = req_match.group(2).strip()
-            required[name] = {'version_req': version_req, 'exact_version': None}
+    for line in lines:
+        match = _DRY_RUN_LINE_RE.match(line)
+        if not match:
+            continue
         
-        would_match = re.search(would_install_pattern, line)
-        if would_match:
-            packages = would_match.group(1).split()
+        if match.group('req_name'):
+            name = canonicalize_name(match.group('req_name'))
+            version_req = match.group('version_req').strip()
+            required[name] = {'version_req': version_req, 'exact_version': None}
+        else:
+            packages = match.group('would_install').split()
             for pkg in packages:
-                parts = pkg.split('-')
-                if len(parts) >= 2:
-                    name = '-'.join(parts[:-1]).lower()
-                    exact_version = parts[-1]
+                token_match = _WOULD_INSTALL_TOKEN_RE.match(pkg)
+                if token_match:
+                    name = canonicalize_name(token_match.group('name'))
+                    exact_version = token_match.group('ver')
                     if name in required:
                         required[name]['exact_version'] = exact_version
                     else:
@@ -123,76 +263,131 @@ def parse_required_packages(pip_dry_run_output):
     
     return required
 
-def safe_get_dependent_packages(pkg):
+def _env_fingerprint(installed):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((tuple(sys.version_info), sys.prefix)).encode())
+    for name, dist_version in sorted(installed.items()):
+        digest.update(f"{name}=={dist_version}\n".encode())
+    return digest.hexdigest()
+
+def _prune_metadata_cache(expired_before):
+    for cache_file in METADATA_CACHE_DIR.glob("*.json"):
+        try:
+            if cache_file.stat().st_mtime <= expired_before:
+                cache_file.unlink()
+        except OSError:
+            pass
+
+def _cached_requirements(func):
+    @functools.wraps(func)
+    def wrapper(packages, installed):
+        key = hashlib.sha256((" ".join(packages) + _env_fingerprint(installed)).encode()).hexdigest()
+        cache_file = METADATA_CACHE_DIR / f"{key}.json"
+        expired_before = time.time() - METADATA_CACHE_TTL
+        try:
+            if cache_file.stat().st_mtime > expired_before:
+                with open(cache_file, encoding="utf-8") as f:
+                    required = json.load(f)
+                logger.info(f"\nDépendances de {', '.join(packages)} lues depuis le cache.")
+                return required, []
+        except (OSError, ValueError):
+            pass
+        
+        required, failed, resolved_together = func(packages)
+        if required and resolved_together:
+            try:
+                METADATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                _prune_metadata_cache(expired_before)
+                with open(cache_file, "w", encoding="utf-8") as f:
+                    json.dump(required, f)
+            except OSError as e:
+                logger.debug(f"Impossible d'écrire le cache {cache_file}: {e}")
+        return required, failed
+    return wrapper
+
+@_cached_requirements
+def get_required_packages(packages):
+    logger.info("\nDétails d'installation:")
+    return get_package_requirements_batch(packages)
+
+def safe_get_dependent_packages(pkg, reverse_deps=None):
     try:
-        return get_dependent_packages(pkg)
+        return get_dependent_packages(pkg, reverse_deps)
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des dépendants de {pkg}: {e}")
         return {}
 
-def extract_compatible_version(version_req):
+@functools.lru_cache(maxsize=4096)
+def _v(version_str):
+    return Version(version_str)
+
+def same_version(a, b):
     try:
-        if '==' in version_req:
-            return version_req.split('==')[1]
-        elif '>=' in version_req:
-            return version_req.split('>=')[1]
-        elif '<=' in version_req:
-            return version_req.split('<=')[1]
+        return _v(a) == _v(b)
+    except InvalidVersion:
+        return a == b
+
+@functools.lru_cache(maxsize=1024)
+def _spec(version_req):
+    return SpecifierSet(version_req)
+
+def extract_compatible_version(version_req):
+    if not version_req:
         return None
-    except:
+    try:
+        specs = {spec.operator: spec.version for spec in _spec(version_req)}
+    except InvalidSpecifier:
         return None
+    for operator in ('==', '>=', '<='):
+        if operator in specs:
+            return specs[operator]
+    return None
 
 def meets_version_requirement(installed_ver, version_req):
-    try:
-        if '==' in version_req:
-            req_ver = version_req.split('==')[1]
-            return installed_ver == req_ver
-        elif '>=' in version_req:
-            req_ver = version_req.split('>=')[1]
-            return version.parse(installed_ver) >= version.parse(req_ver)
-        elif '<=' in version_req:
-            req_ver = version_req.split('<=')[1]
-            return version.parse(installed_ver) <= version.parse(req_ver)
+    if not version_req:
         return True
-    except:
+    try:
+        return _spec(version_req).contains(_v(installed_ver), prereleases=True)
+    except (InvalidSpecifier, InvalidVersion):
         return False
 
-def check_version_conflicts(requirements, installed):
+def check_version_conflicts(requirements, env):
     logger.info("\n🔍 Vérification des conflits de version :")
+    installed, reverse_deps = env
     conflicts = {}
     
-    for pkg, req_info in requirements.items():
-        if pkg in installed:
-            installed_ver = installed[pkg]
-            exact_version = req_info.get('exact_version')
-            version_req = req_info.get('version_req', '')
+    for pkg in sorted(requirements.keys() & installed.keys()):
+        req_info = requirements[pkg]
+        installed_ver = installed[pkg]
+        exact_version = req_info.get('exact_version')
+        version_req = req_info.get('version_req', '')
+        
+        if exact_version and not same_version(installed_ver, exact_version):
+            try:
+                is_downgrade = _v(installed_ver) > _v(exact_version)
+            except InvalidVersion:
+                is_downgrade = None
             
-            if exact_version and installed_ver != exact_version:
-                try:
-                    is_downgrade = version.parse(installed_ver) > version.parse(exact_version)
-                except:
-                    is_downgrade = None
-                
-                logger.warning(f"⚠️ Conflit : {pkg} installé en {installed_ver}, requis {exact_version}")
-                conflicts[pkg] = {
-                    'installed': installed_ver,
-                    'required': exact_version,
-                    'is_downgrade': is_downgrade,
-                    'dependents': safe_get_dependent_packages(pkg)
-                }
-            elif version_req and not meets_version_requirement(installed_ver, version_req):
-                compatible_version = extract_compatible_version(version_req)
-                
-                logger.warning(f"⚠️ Conflit : {pkg} installé en {installed_ver}, mais {version_req} est requis")
-                if compatible_version:
-                    logger.info(f"   → Version compatible suggérée: {compatible_version}")
-                
-                conflicts[pkg] = {
-                    'installed': installed_ver,
-                    'required': compatible_version or '?',
-                    'version_req': version_req,
-                    'dependents': safe_get_dependent_packages(pkg)
-                }
+            logger.warning(f"⚠️ Conflit : {pkg} installé en {installed_ver}, requis {exact_version}")
+            conflicts[pkg] = {
+                'installed': installed_ver,
+                'required': exact_version,
+                'is_downgrade': is_downgrade,
+                'dependents': safe_get_dependent_packages(pkg, reverse_deps)
+            }
+        elif version_req and not meets_version_requirement(installed_ver, version_req):
+            compatible_version = extract_compatible_version(version_req)
+            
+            logger.warning(f"⚠️ Conflit : {pkg} installé en {installed_ver}, mais {version_req} est requis")
+            if compatible_version:
+                logger.info(f"   → Version compatible suggérée: {compatible_version}")
+            
+            conflicts[pkg] = {
+                'installed': installed_ver,
+                'required': compatible_version or '?',
+                'version_req': version_req,
+                'dependents': safe_get_dependent_packages(pkg, reverse_deps)
+            }
     
     if not conflicts:
         logger.info("✅ Aucun conflit détecté.")
@@ -221,22 +416,20 @@ def analyze_update_impact(conflicts):
 
 def is_version_compatible(requirement, version_str):
     try:
-        spec_match = re.search(r'([<>=~!].+)', requirement)
-        if not spec_match:
+        specifier = Requirement(requirement).specifier
+        if not specifier:
             return True
         
-        version_spec = spec_match.group(1)
-        pkg_name = requirement.split(version_spec)[0].strip()
-        
-        req = f"{pkg_name}{version_spec}"
-        
-        return pkg_resources.require(req)[0].version == version_str
-    except (pkg_resources.VersionConflict, pkg_resources.DistributionNotFound):
+        return specifier.contains(Version(version_str), prereleases=True)
+    except (InvalidRequirement, InvalidVersion):
         return False
     except Exception as e:
         logger.error(f"Erreur lors de la vérification de compatibilité: {e}")
         return False
 
+def _yes(prompt, auto=False):
+    return auto or input(prompt).lstrip()[:1] in ('o', 'O', 'y', 'Y')
+
 def confirm_update(pkg, info, auto_yes=False):
     if auto_yes:
         logger.info(f"Auto-confirmation pour {'downgrader' if info.get('is_downgrade') else 'mettre à jour'} "
@@ -251,28 +444,57 @@ def confirm_update(pkg, info, auto_yes=False):
         logger.warning("   Cela peut causer des problèmes de compatibilité avec d'autres packages.")
     
     if dependents > 0:
-        response = input(f"\n⚠️ {pkg} est utilisé par {dependents} autres packages. {action.capitalize()} quand même? (o/O/n/N): ")
-    else:
-        response = input(f"\n{action.capitalize()} {pkg} de {info['installed']} vers {info['required']}? (o/O/n/N): ")
-    
-    return response.lower() == 'o' or response.upper() == 'O'
+        return _yes(f"\n⚠️ {pkg} est utilisé par {dependents} autres packages. {action.capitalize()} quand même? (o/O/n/N): ")
+    return _yes(f"\n{action.capitalize()} {pkg} de {info['installed']} vers {info['required']}? (o/O/n/N): ")
+
+def _topo_order(conflicts):
+    indeg = {pkg: 0 for pkg in conflicts}
+    succ = defaultdict(list)
+    for pkg, info in conflicts.items():
+        for dependent in info['dependents']:
+            dependent = canonicalize_name(dependent)
+            if dependent in indeg and dependent != pkg:
+                succ[pkg].append(dependent)
+                indeg[dependent] += 1
+    
+    queue = deque(sorted((pkg for pkg, degree in indeg.items() if degree == 0),
+                         key=lambda pkg: len(conflicts[pkg]['dependents'])))
+    order = []
+    while queue:
+        pkg = queue.popleft()
+        order.append(pkg)
+        for dependent in succ[pkg]:
+            indeg[dependent] -= 1
+            if indeg[dependent] == 0:
+                queue.append(dependent)
+    
+    return order
 
 def resolve_dependency_conflict(package, version_conflict, auto_yes=False):
     logger.info(f"\n🔄 Résolution automatique des conflits pour installer {package}...")
     
-    sorted_conflicts = sorted(version_conflict.items(), 
-                             key=lambda x: len(x[1]['dependents']), 
-                             reverse=False)
+    order = _topo_order(version_conflict)
+    if len(order) == len(version_conflict):
+        sorted_conflicts = [(pkg, version_conflict[pkg]) for pkg in order]
+    else:
+        logger.warning("⚠️ Dépendances circulaires entre les conflits, ordre par nombre de dépendants.")
+        sorted_conflicts = sorted(version_conflict.items(), 
+                                 key=lambda x: len(x[1]['dependents']), 
+                                 reverse=False)
     
-    success = True
+    plan = []
     for pkg_name, conflict_info in sorted_conflicts:
         current_version = conflict_info['installed']
         required_version = conflict_info['required']
         
+        if required_version == '?':
+            logger.warning(f"⚠️ Aucune version cible déterminable pour {pkg_name}, conflit ignoré.")
+            continue
+        
         try:
-            is_downgrade = version.parse(current_version) > version.parse(required_version)
+            is_downgrade = _v(current_version) > _v(required_version)
             action = "downgrade" if is_downgrade else "upgrade"
-        except:
+        except InvalidVersion:
             action = "mise à jour"
         
         logger.info(f"\n📦 {action.capitalize()} nécessaire: {pkg_name} {current_version} → {required_version}")
@@ -283,96 +505,90 @@ def resolve_dependency_conflict(package, version_conflict, auto_yes=False):
             for dep, dep_info in dependent_pkgs.items():
                 logger.info(f"  - {dep} v{dep_info['version']} ({dep_info['requirement']})")
         
-        if not auto_yes:
-            confirm = input(f"Procéder au {action} de {pkg_name}? (o/O/n/N): ")
-            if confirm.lower() != 'o' and confirm.upper() != 'O':
-                logger.warning(f"❌ {action.capitalize()} annulé pour {pkg_name}.")
-                return False
-        
-        try:
-            logger.info(f"🔄 {action.capitalize()} de {pkg_name} {current_version} → {required_version}...")
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                f"{pkg_name}=={required_version}", "--force-reinstall"
-            ], stdout=subprocess.PIPE)
-            logger.info(f"✅ {pkg_name} {action} vers {required_version} avec succès.")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"❌ Échec du {action} de {pkg_name}: {e}")
-            success = False
-            
-            if not auto_yes:
-                retry = input(f"Continuer malgré l'échec du {action} de {pkg_name}? (o/O/n/N): ")
-                if retry.lower() != 'o' and retry.upper() != 'O':
-                    return False
+        plan.append((pkg_name, required_version))
+    
+    if not plan:
+        return True, set()
     
-    return success
+    if not _yes(f"\nProcéder à ces {len(plan)} opérations? (o/O/n/N): ", auto_yes):
+        logger.warning("❌ Résolution des conflits annulée.")
+        return False, set()
+    
+    pinned_specs = [f"{pkg_name}=={required_version}" for pkg_name, required_version in plan]
+    try:
+        logger.info(f"🔄 Installation de {' '.join(pinned_specs)}...")
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install", 
+            *pinned_specs, "--force-reinstall"
+        ], stdout=subprocess.DEVNULL)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"❌ Échec de la résolution des conflits: {e}")
+        _invalidate_dist_cache()
+        return False, set()
+    
+    _invalidate_dist_cache()
+    logger.info(f"✅ {len(plan)} conflits résolus avec succès.")
+    return True, {pkg_name for pkg_name, _ in plan}
 
-def install_package_with_deps(package, auto_yes=False):
-    package_name = package.split('==')[0].split('>=')[0].split('<=')[0]
-    logger.info(f"\n📦 Vérification des dépendances pour {package}...")
+def install_package_with_deps(packages, auto_yes=False, paranoid=False):
+    label = ", ".join(packages)
+    logger.info(f"\n📦 Vérification des dépendances pour {label}...")
     
-    installed = get_installed_packages()
-    dry_run_output = get_package_requirements(package)
+    env = _scan_env()
+    required, failed = get_required_packages(packages, env[0])
     
-    if not dry_run_output:
-        logger.warning(f"⚠️ Impossible de récupérer les informations pour {package}.")
+    if required is None:
+        logger.warning(f"⚠️ Impossible de récupérer les informations pour {label}.")
         return False
     
-    logger.info("\nDétails d'installation:")
-    logger.info(dry_run_output)
+    if failed:
+        logger.warning(f"⚠️ Impossible de résoudre {', '.join(failed)}, ces packages ne seront pas installés.")
+        packages = [pkg for pkg in packages if pkg not in failed]
+        label = ", ".join(packages)
     
-    required = parse_required_packages(dry_run_output)
     if not required:
         logger.warning("⚠️ Impossible d'analyser les dépendances.")
         return False
     
-    conflicts = check_version_conflicts(required, installed)
+    conflicts = check_version_conflicts(required, env)
     
     if conflicts:
         analyze_update_impact(conflicts)
         
         if auto_yes:
             logger.info("\nRésolution automatique des conflits de dépendances (option -y active)")
-            resolve = True
-        else:
-            resolve_choice = input("\nRésoudre automatiquement les conflits de dépendances? (o/O/n/N): ")
-            resolve = resolve_choice.lower() == 'o' or resolve_choice.upper() == 'O'
         
-        if resolve:
-            resolution_success = resolve_dependency_conflict(package, conflicts, auto_yes)
+        if _yes("\nRésoudre automatiquement les conflits de dépendances? (o/O/n/N): ", auto_yes):
+            resolution_success, resolved = resolve_dependency_conflict(label, conflicts, auto_yes)
             if not resolution_success:
-                logger.warning(f"⚠️ Échec de la résolution des conflits. Installation de {package} interrompue.")
+                logger.warning(f"⚠️ Échec de la résolution des conflits. Installation de {label} interrompue.")
                 return False
             
-            installed = get_installed_packages()
-            
-            remaining_conflicts = check_version_conflicts(required, installed)
+            if paranoid:
+                remaining_conflicts = check_version_conflicts(required, _scan_env())
+            else:
+                remaining_conflicts = {pkg: info for pkg, info in conflicts.items() if pkg not in resolved}
             if remaining_conflicts:
                 logger.warning("⚠️ Des conflits persistent malgré la tentative de résolution.")
-                if not auto_yes:
-                    force_install = input(f"Forcer l'installation de {package} malgré les conflits? (o/O/n/N): ")
-                    if force_install.lower() != 'o' and force_install.upper() != 'O':
-                        logger.info("Installation annulée.")
-                        return False
+                if not _yes(f"Forcer l'installation de {label} malgré les conflits? (o/O/n/N): ", auto_yes):
+                    logger.info("Installation annulée.")
+                    return False
         else:
-            logger.info(f"Installation de {package} annulée.")
+            logger.info(f"Installation de {label} annulée.")
             return False
     
     if auto_yes:
-        logger.info(f"Installation automatique de {package} (option -y active)")
-        confirm = True
-    else:
-        install_choice = input(f"\nSouhaitez-vous installer {package}? (o/O/n/N): ")
-        confirm = install_choice.lower() == 'o' or install_choice.upper() == 'O'
+        logger.info(f"Installation automatique de {label} (option -y active)")
     
-    if confirm:
+    if _yes(f"\nSouhaitez-vous installer {label}? (o/O/n/N): ", auto_yes):
         try:
-            logger.info(f"🔄 Installation de {package}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-            logger.info(f"✅ {package} a été installé avec succès.")
+            logger.info(f"🔄 Installation de {label}...")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *packages])
+            _invalidate_dist_cache()
+            logger.info(f"✅ {label} a été installé avec succès.")
             return True
         except subprocess.CalledProcessError as e:
-            logger.error(f"❌ Erreur lors de l'installation de {package}: {e}")
+            logger.error(f"❌ Erreur lors de l'installation de {label}: {e}")
             error_output = str(e.output) if hasattr(e, 'output') else "Aucun détail supplémentaire"
             logger.error(f"Détails de l'erreur: {error_output}")
             return False
@@ -467,11 +683,9 @@ PACKAGE_TO_MODULE_MAP = {
     'rich': 'rich',
     'colorama': 'colorama',
     'tabulate': 'tabulate',
-    'pygments': 'pygments',
     'loguru': 'loguru',
     'structlog': 'structlog',
     'python-json-logger': 'pythonjsonlogger',
-    'pyyaml': 'yaml',
     'jsonschema': 'jsonschema',
     'marshmallow': 'marshmallow',
     'pydantic': 'pydantic',
@@ -501,7 +715,6 @@ PACKAGE_TO_MODULE_MAP = {
     'importlib-resources': 'importlib_resources',
     'pkg_resources': 'pkg_resources',
     'setuptools_scm': 'setuptools_scm',
-    'wheel': 'wheel',
     'build': 'build',
     'twine': 'twine',
     'pip-tools': 'piptools',
@@ -511,8 +724,6 @@ PACKAGE_TO_MODULE_MAP = {
     'conda': 'conda',
     'mamba': 'mamba',
     'nox': 'nox',
-    'invoke': 'invoke',
-    'fabric': 'fabric',
     'ansible': 'ansible',
     'salt': 'salt',
     'chef': 'chef',
@@ -529,11 +740,9 @@ PACKAGE_TO_MODULE_MAP = {
     'nomad': 'nomad',
     'etcd': 'etcd',
     'zookeeper': 'zookeeper',
-    'celery': 'celery',
     'rq': 'rq',
     'huey': 'huey',
     'dramatiq': 'dramatiq',
-    'kombu': 'kombu',
     'pyzmq': 'zmq',
     'zerorpc': 'zerorpc',
     'grpcio': 'grpc',
@@ -543,83 +752,110 @@ PACKAGE_TO_MODULE_MAP = {
     'fastavro': 'fast',
     'jax': 'jax'
 }
+PACKAGE_TO_MODULE_MAP = types.MappingProxyType({k.lower(): v for k, v in PACKAGE_TO_MODULE_MAP.items()})
  
 
-def is_present(argv, auto_yes=False):
-    for package in argv:
-        package_name = package.split('==')[0].split('>=')[0].split('<=')[0]
-        
-        module_name = PACKAGE_TO_MODULE_MAP.get(package_name, package_name)
-        
-        try:
-            importlib.import_module(module_name)
+def _pkg_name(spec):
+    return _NAME_SPLIT_RE.split(spec, 1)[0].strip()
+
+def _probe(package, installed_names):
+    package_name = _pkg_name(package)
+    
+    if canonicalize_name(package_name) in installed_names:
+        return package, True
+    
+    module_name = PACKAGE_TO_MODULE_MAP.get(package_name.lower(), package_name)
+    
+    try:
+        if importlib.util.find_spec(module_name.partition('.')[0]) is None:
+            return package, False
+        return package, importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return package, False
+
+def is_present(argv, auto_yes=False, paranoid=False):
+    installed_names = _fast_installed()
+    with ThreadPoolExecutor(max_workers=min(32, len(argv) or 1)) as executor:
+        results = list(executor.map(lambda package: _probe(package, installed_names), argv))
+    
+    missing = []
+    for package, already_installed in results:
+        if already_installed:
             logger.info(f"✅ {package} est déjà installé.")
-        except ImportError:
+        else:
             logger.warning(f"❌ {package} n'est pas installé. Vérification des dépendances...")
-            install_package_with_deps(package, auto_yes)
+            missing.append(package)
+    
+    if missing:
+        install_package_with_deps(missing, auto_yes, paranoid)
 
 # ---------- MAIN ----------
-if __name__ == "__main__":
-    auto_yes = '-y' in sys.argv
+def main():
+    parser = argparse.ArgumentParser(description="Installer des packages Python en vérifiant les conflits de dépendances")
+    parser.add_argument("packages", nargs="*", metavar="nom_du_package", help="Packages à vérifier/installer (ex: \"numpy>=1.26\")")
+    parser.add_argument("-y", dest="auto_yes", action="store_true", help="Répondre 'oui' automatiquement à toutes les questions")
+    parser.add_argument("--paranoid", action="store_true", help="Réanalyser tout l'environnement après la résolution des conflits")
+    
+    args = parser.parse_args()
+    auto_yes = args.auto_yes
+    
+    if not args.packages:
+        logger.error("Usage: python main.py [-y] nom_du_package [nom_du_package2 ...]")
+        logger.error("  -y : Répondre 'oui' automatiquement à toutes les questions")
+        return 1
+    
     if auto_yes:
-        sys.argv.remove('-y')
         logger.info("📢 Mode automatique activé : toutes les questions auront une réponse 'oui' par défaut.")
     
     logger.info("🔍 Vérification de pip...")
-    pip_installed, pip_version = check_pip_installed()
+    pip_version, latest_pip_version, pip_up_to_date = get_pip_status()
     
-    if not pip_installed:
+    if pip_version is None:
         logger.error("❌ pip n'est pas installé ou n'est pas accessible.")
         logger.error("Impossible de continuer sans pip. Veuillez installer pip et réessayer.")
-        sys.exit(1)
+        return 1
     
     logger.info(f"✅ pip version {pip_version} est installé.")
     
-    if check_pip_latest_version():
+    if pip_up_to_date:
         logger.info(f"✅ pip est déjà à la dernière version ({pip_version}).")
     else:
+        if latest_pip_version:
+            logger.info(f"Nouvelle version de pip disponible: {latest_pip_version}")
         if auto_yes:
             logger.info("Mise à jour automatique de pip (option -y active)")
-            update_pip_choice = 'o'
-        else:
-            update_pip_choice = input("Voulez-vous mettre à jour pip vers la dernière version? (o/O/n/N): ")
         
-        if update_pip_choice.lower() == 'o' or update_pip_choice.upper() == 'O':
-            if update_pip():
-                _, new_pip_version = check_pip_installed()
+        if _yes("Voulez-vous mettre à jour pip vers la dernière version? (o/O/n/N): ", auto_yes):
+            new_pip_version = update_pip()
+            if new_pip_version:
                 logger.info(f"✅ pip mis à jour vers la version {new_pip_version}.")
             else:
                 logger.warning("⚠️ Poursuite du programme avec la version actuelle de pip.")
     
-    argc = len(sys.argv)
-    argv = sys.argv
-
+    venv = os.environ.get('VIRTUAL_ENV')
+    conda = os.environ.get('CONDA_DEFAULT_ENV')
+    
     logger.info(f"Python exécutable utilisé: {sys.executable}")
-    logger.info(f"Dans un environnement virtuel? {is_virtualenv()}")
-    logger.info(f"Dans un environnement conda? {is_conda_env()}")
+    logger.info(f"Dans un environnement virtuel? {venv is not None}")
+    logger.info(f"Dans un environnement conda? {conda is not None}")
 
-    if is_conda_env():
-        logger.info(f"Conda env: {os.getenv('CONDA_DEFAULT_ENV')}")
-    elif is_virtualenv():
-        logger.info(f"Environnement virtuel: {os.getenv('VIRTUAL_ENV')}") 
+    if conda is not None:
+        logger.info(f"Conda env: {conda}")
+    elif venv is not None:
+        logger.info(f"Environnement virtuel: {venv}") 
     else:
         logger.warning("⚠️⚠️⚠️⚠️⚠️ Vous n'êtes pas dans un environnement virtuel ou conda. ⚠️⚠️⚠️⚠️")
         logger.warning("⚠️⚠️⚠️⚠️⚠️ Il est recommandé d'utiliser ce script dans un environnement isolé. ⚠️⚠️⚠️⚠️")
         
         if auto_yes:
             logger.info("Continuation automatique (option -y active)")
-            proceed = 'o'
-        else:
-            proceed = input("Voulez-vous continuer quand même? (o/O/n/N): ")
             
-        if proceed.lower() != 'o' and proceed.upper() != 'O':
+        if not _yes("Voulez-vous continuer quand même? (o/O/n/N): ", auto_yes):
             logger.info("Opération annulée.")
-            sys.exit(1)
+            return 1
     
-    if argc < 2:
-        logger.error("Usage: python script.py [-y] nom_du_package [nom_du_package2 ...]")
-        logger.error("  -y : Répondre 'oui' automatiquement à toutes les questions")
-        sys.exit(1)
-    
-    packages_to_check = sys.argv[1:]
-    is_present(packages_to_check, auto_yes)
\ No newline at end of file
+    is_present(args.packages, auto_yes, args.paranoid)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())